@@ -0,0 +1,32 @@
+"""
+按需计算的只读字典
+"""
+from collections.abc import Mapping
+
+
+class LazyDict(Mapping):
+    """只读字典：每个值由一个无参函数给出，第一次访问该键时才计算，之后复用结果"""
+    
+    def __init__(self, factories):
+        self._factories = dict(factories)
+        self._values = {}
+    
+    def __getitem__(self, key):
+        if key not in self._values:
+            self._values[key] = self._factories[key]()
+        return self._values[key]
+    
+    def __iter__(self):
+        return iter(self._factories)
+    
+    def __len__(self):
+        return len(self._factories)
+    
+    def __repr__(self):
+        computed = ', '.join(f'{key!r}: {self._values[key]!r}' if key in self._values else f'{key!r}: ...'
+                             for key in self._factories)
+        return f'LazyDict({{{computed}}})'
+    
+    def __reduce__(self):
+        # 序列化（pickle/deepcopy）时计算全部的值，得到普通字典
+        return (dict, (dict(self),))
\ No newline at end of file
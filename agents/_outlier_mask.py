@@ -0,0 +1,88 @@
+"""
+IQR异常值掩码计算（安装了Numba时使用并行内核）
+"""
+import threading
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Numba的workqueue线程层不是线程安全的，多个线程（如Web请求）同时调用并行内核会使进程中止，
+# 因此内核调用串行执行（内核本身已按列并行）
+_KERNEL_LOCK = threading.Lock()
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _iqr_outlier_kernel(block, whisker, out):
+        # 每列独立：排序非缺失值求四分位数（与np.nanquantile的线性插值一致），再标记异常值
+        n_rows = block.shape[0]
+        for j in numba.prange(block.shape[1]):
+            column = block[:, j]
+            values = np.sort(column[~np.isnan(column)])
+            n = values.shape[0]
+            if n == 0:
+                for i in range(n_rows):
+                    out[i, j] = False
+                continue
+            
+            quartiles = np.empty(2)
+            for k, q in enumerate((0.25, 0.75)):
+                pos = q * (n - 1)
+                lo = int(np.floor(pos))
+                hi = min(lo + 1, n - 1)
+                quartiles[k] = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+            iqr = quartiles[1] - quartiles[0]
+            lower = quartiles[0] - whisker * iqr
+            upper = quartiles[1] + whisker * iqr
+            
+            for i in range(n_rows):
+                v = column[i]
+                out[i, j] = v < lower or v > upper
+        return out
+
+
+def iqr_outlier_mask(block, whisker=1.5):
+    """
+    按IQR规则计算异常值掩码（安装了Numba时四分位数和掩码在同一个并行内核中完成）
+
+    Args:
+        block: 二维浮点数组 (n_samples, n_features)
+        whisker: IQR的倍数，超出[Q1 - whisker*IQR, Q3 + whisker*IQR]的值为异常值
+
+    Returns:
+        与block同形状的布尔数组，True表示异常值
+    """
+    if numba is not None:
+        block = np.asfortranarray(block, dtype=np.float64)
+        out = np.empty(block.shape, dtype=np.bool_, order='F')
+        with _KERNEL_LOCK:
+            return _iqr_outlier_kernel(block, float(whisker), out)
+
+    Q1, Q3 = np.nanquantile(block, [0.25, 0.75], axis=0)
+    IQR = Q3 - Q1
+    return outlier_mask(block, Q1 - whisker * IQR, Q3 + whisker * IQR)
+
+
+def outlier_mask(block, lower, upper):
+    """
+    计算异常值掩码
+
+    Args:
+        block: 二维浮点数组 (n_samples, n_features)
+        lower: 每列的下界
+        upper: 每列的上界
+
+    Returns:
+        与block同形状的布尔数组，True表示异常值
+    """
+    # 按列存储，后续按列取索引
+    block = np.asfortranarray(block, dtype=np.float64)
+    lower = np.ascontiguousarray(lower, dtype=np.float64)
+    upper = np.ascontiguousarray(upper, dtype=np.float64)
+    out = np.empty(block.shape, dtype=np.bool_, order='F')
+    np.less(block, lower, out=out)
+    out |= block > upper
+    return out
\ No newline at end of file
@@ -1,10 +1,17 @@
 import pandas as pd
 import numpy as np
+from agents._outlier_mask import iqr_outlier_mask
 
 class DataCleaner:
     def __init__(self, df):
         self.df = df
         self.cleaning_report = {}
+        self._refresh_numeric_cols()
+    
+    def _refresh_numeric_cols(self):
+        """重新获取数值列（数据的列或类型发生变化后调用）"""
+        self._numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        return self
     
     def detect_missing_values(self):
         """检测缺失值"""
@@ -18,43 +25,48 @@ class DataCleaner:
     
     def handle_missing_values(self, strategy='median'):
         """处理缺失值"""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        
-        if strategy == 'median':
-            for col in numeric_cols:
-                if self.df[col].isnull().any():
-                    self.df[col] = self.df[col].fillna(self.df[col].median())
-        elif strategy == 'mean':
-            for col in numeric_cols:
-                if self.df[col].isnull().any():
-                    self.df[col] = self.df[col].fillna(self.df[col].mean())
+        numeric_cols = self._numeric_cols
         
+        # 一次性取出数值块，缺失掩码只计算一次
+        block = self.df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        mask = np.isnan(block)
+        affected = mask.any(axis=0)
+
+        if strategy in ('median', 'mean') and affected.any():
+            # 只对含缺失值的列计算填充值并写回，其余列保持原dtype
+            filled = block[:, affected]
+            filled_mask = mask[:, affected]
+            if strategy == 'median':
+                fill_values = np.nanmedian(filled, axis=0)
+            else:
+                fill_values = np.nanmean(filled, axis=0)
+            filled[filled_mask] = np.take(fill_values, np.nonzero(filled_mask)[1])
+            self.df[numeric_cols[affected]] = filled
+
         self.cleaning_report['missing_treatment'] = {
             'strategy': strategy,
-            'columns_affected': list(numeric_cols[self.df[numeric_cols].isnull().any()])
+            'columns_affected': list(numeric_cols[affected])
         }
         return self
     
     def detect_outliers(self, method='iqr'):
         """检测异常值"""
         outliers_report = {}
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        numeric_cols = self._numeric_cols
         
         if method == 'iqr':
-            for col in numeric_cols:
-                Q1 = self.df[col].quantile(0.25)
-                Q3 = self.df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
-                outliers = self.df[(self.df[col] < lower_bound) | (self.df[col] > upper_bound)]
-                if len(outliers) > 0:
-                    outliers_report[col] = {
-                        'count': len(outliers),
-                        'percentage': (len(outliers) / len(self.df)) * 100,
-                        'indices': outliers.index.tolist()
-                    }
+            # 所有列的四分位数和异常值掩码一次算出（安装了Numba时在同一个并行内核中完成）
+            block = self.df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+            mask = iqr_outlier_mask(block, whisker=1.5)
+            counts = mask.sum(axis=0)
+            for j in np.flatnonzero(counts):
+                count = int(counts[j])
+                outliers_report[numeric_cols[j]] = {
+                    'count': count,
+                    'percentage': (count / len(self.df)) * 100,
+                    # 保留为紧凑的NumPy数组，仅在导出JSON时才转换为列表
+                    'indices': self.df.index[np.flatnonzero(mask[:, j])].to_numpy()
+                }
         
         self.cleaning_report['outliers'] = outliers_report
         return self
@@ -1,15 +1,18 @@
 import pandas as pd
 import numpy as np
 import os
+import logging
 from config import DATA_CONFIG
 
+logger = logging.getLogger(__name__)
+
 class KaggleDataLoader:
     def __init__(self, data_path=None):
         """
         初始化Kaggle数据加载器
         
         Args:
-            data_path: 数据文件路径，如果为None则使用默认路径
+            data_path: 数据文件路径或可读的文件对象（如上传文件的流），如果为None则使用默认路径
         """
         self.data_path = data_path or DATA_CONFIG['default_path']
         self.raw_data = None
@@ -27,23 +30,19 @@ class KaggleDataLoader:
     def load_data(self):
         """加载Kaggle乳腺癌数据"""
         try:
-            print(f"正在加载数据: {self.data_path}")
+            logger.info("正在加载数据: %s", self.data_path)
             
-            # 检查文件是否存在
-            if not os.path.exists(self.data_path):
+            # 检查文件是否存在（文件对象直接读取）
+            if not hasattr(self.data_path, 'read') and not os.path.exists(self.data_path):
                 raise FileNotFoundError(f"数据文件不存在: {self.data_path}")
             
             # 读取CSV文件
-            self.raw_data = pd.read_csv(self.data_path)
-            print(f"数据加载成功: {self.raw_data.shape[0]} 行, {self.raw_data.shape[1]} 列")
-            
-            # 显示前几行数据
-            print("\n数据预览:")
-            print(self.raw_data.head())
+            self.raw_data = self._read_csv()
+            logger.info("数据加载成功: %d 行, %d 列", self.raw_data.shape[0], self.raw_data.shape[1])
             
-            # 显示列名
-            print("\n数据列名:")
-            print(self.raw_data.columns.tolist())
+            # 数据预览和列名只在DEBUG级别输出（%s格式化是惰性的，未启用时不会生成字符串）
+            logger.debug("数据预览:\n%s", self.raw_data.head())
+            logger.debug("数据列名: %s", self.raw_data.columns.tolist())
             
             # 数据预处理
             self._preprocess_data()
@@ -51,64 +50,91 @@ class KaggleDataLoader:
             return self.raw_data
             
         except Exception as e:
-            print(f"数据加载失败: {str(e)}")
+            logger.error("数据加载失败: %s", e)
             raise
     
+    def _read_csv(self):
+        """读取CSV文件，需要删除的列在解析阶段直接跳过"""
+        header = pd.read_csv(self._rewind(), nrows=0).columns
+        usecols = [col for col in header if col not in self.drop_columns]
+        
+        # 表头行尾多余的分隔符会生成末尾的空列名（pandas命名为'Unnamed: N'），而数据行没有对应字段，
+        # PyArrow引擎要求各行列数一致，此时去掉这些不需要的列名，跳过表头行按给定列名读取
+        names = list(header)
+        while names and names[-1].startswith('Unnamed:') and names[-1] not in usecols:
+            names.pop()
+        try:
+            # 优先使用PyArrow引擎多线程解析（列为NumPy类型，后续各步骤的to_numpy无需再从Arrow转换）
+            if len(names) == len(header):
+                return pd.read_csv(self._rewind(), engine='pyarrow', usecols=usecols)
+            data = pd.read_csv(self._rewind(), engine='pyarrow', names=names, header=None, skiprows=1)
+            # 数据行实际也带有末尾空字段时列数多于列名，交给默认C引擎处理
+            if list(data.columns) == names:
+                return data[usecols]
+        except (ImportError, ValueError):
+            pass
+        # 未安装pyarrow，或文件格式不规整时使用默认C引擎
+        return pd.read_csv(self._rewind(), usecols=usecols)
+    
+    def _rewind(self):
+        """返回待读取的数据源；文件对象需要多次读取，每次读取前回到开头"""
+        if hasattr(self.data_path, 'seek'):
+            self.data_path.seek(0)
+        return self.data_path
+    
     def _preprocess_data(self):
         """预处理数据"""
-        print("\n开始数据预处理...")
+        logger.info("开始数据预处理...")
         
         # 1. 检查诊断结果列是否存在
         if self.diagnosis_column not in self.raw_data.columns:
             raise ValueError(f"诊断结果列 '{self.diagnosis_column}' 不存在于数据中")
         
-        # 2. 创建备份
-        original_data = self.raw_data.copy()
-        
-        # 3. 删除不需要的列
-        columns_to_drop = []
-        for col in self.drop_columns:
-            if col in self.raw_data.columns:
-                columns_to_drop.append(col)
-        
+        # 2. 将诊断结果转换为数值
+        logger.debug("转换诊断结果列: %s", self.diagnosis_column)
+        diagnosis = self.raw_data[self.diagnosis_column]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("诊断结果唯一值: %s", diagnosis.unique())
+        
+        # 用Categorical一次得到整数编码，不在映射中的值编码为-1
+        codes = pd.Categorical(diagnosis, categories=list(self.diagnosis_mapping)).codes
+        unmapped = (codes == -1) & diagnosis.notna().to_numpy()
+        if unmapped.any():
+            raise ValueError(f"诊断结果值 '{diagnosis[unmapped].iloc[0]}' 不在映射字典中")
+        
+        # 编码到映射值的查表，目标列使用int8；有缺失诊断时保留NaN
+        target_values = np.array(list(self.diagnosis_mapping.values()), dtype=np.int8)
+        if (codes == -1).any():
+            target = np.where(codes == -1, np.nan, target_values[codes])
+        else:
+            target = target_values[codes]
+        
+        # 3. 删除不需要的列和原始诊断列，并加入target列（只做一次列选择）
+        columns_to_drop = [col for col in self.drop_columns if col in self.raw_data.columns]
         if columns_to_drop:
-            print(f"删除列: {columns_to_drop}")
-            self.raw_data = self.raw_data.drop(columns=columns_to_drop)
-        
-        # 4. 将诊断结果转换为数值
-        print(f"转换诊断结果列: {self.diagnosis_column}")
-        unique_values = self.raw_data[self.diagnosis_column].unique()
-        print(f"诊断结果唯一值: {unique_values}")
-        
-        # 检查是否所有值都在映射中
-        for val in unique_values:
-            if pd.isna(val):
-                continue
-            if val not in self.diagnosis_mapping:
-                raise ValueError(f"诊断结果值 '{val}' 不在映射字典中")
-        
-        # 执行转换
-        self.raw_data[self.target_column] = self.raw_data[self.diagnosis_column].map(self.diagnosis_mapping)
+            logger.debug("删除列: %s", columns_to_drop)
         
-        # 5. 删除原始诊断列（保留转换后的target列）
+        excluded = set(columns_to_drop)
         if self.diagnosis_column != self.target_column:
-            self.raw_data = self.raw_data.drop(columns=[self.diagnosis_column])
+            excluded.add(self.diagnosis_column)
+        keep_columns = [col for col in self.raw_data.columns if col not in excluded]
+        self.raw_data = self.raw_data[keep_columns].assign(**{self.target_column: target})
         
-        # 6. 检查转换结果
-        target_distribution = self.raw_data[self.target_column].value_counts()
-        print(f"目标变量分布: {target_distribution.to_dict()}")
+        # 4. 检查转换结果
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("目标变量分布: %s", self.raw_data[self.target_column].value_counts().to_dict())
         
-        # 7. 获取特征名称（排除目标列）
+        # 5. 获取特征名称（排除目标列）
         self.feature_names = [col for col in self.raw_data.columns if col != self.target_column]
-        print(f"特征数量: {len(self.feature_names)}")
-        print(f"特征示例: {self.feature_names[:5]}...")
+        logger.debug("特征数量: %d", len(self.feature_names))
+        logger.debug("特征示例: %s...", self.feature_names[:5])
         
-        # 8. 基本统计信息
-        print(f"\n数据形状: {self.raw_data.shape}")
-        print(f"数据类型:")
-        print(self.raw_data.dtypes.value_counts())
+        # 6. 基本统计信息
+        logger.debug("数据形状: %s", self.raw_data.shape)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("数据类型:\n%s", self.raw_data.dtypes.value_counts())
         
-        print("数据预处理完成!")
+        logger.info("数据预处理完成!")
         
     def get_data_info(self):
         """获取数据信息"""
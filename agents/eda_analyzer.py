@@ -1,199 +1,453 @@
+import inspect
+import threading
 import pandas as pd
 import numpy as np
+from contextlib import contextmanager
+from functools import cached_property, wraps
 from scipy import stats
+from agents._lazy_dict import LazyDict
+
+try:
+    # 可选依赖：多核、NaN感知的相关性矩阵计算
+    from nancorrmp.nancorrmp import NaNCorrMp
+except ImportError:
+    NaNCorrMp = None
+
+try:
+    # 可选依赖：逐列检验时用线程并行（scikit-learn的依赖，通常已安装）
+    from joblib import Parallel, delayed
+except ImportError:
+    Parallel = delayed = None
+
+# Shapiro检验的最大样本量，超过时随机抽样
+MAX_NORM_N = 5000
+
+# 分布分析输出的统计量（描述性统计表中的行名 -> 结果中的键名）
+DISTRIBUTION_STATS = {
+    'mean': 'mean',
+    'std': 'std',
+    'skew': 'skewness',
+    'kurtosis': 'kurtosis',
+    'median': 'median',
+    'min': 'min',
+    'max': 'max'
+}
+
+
+def _sorted_quantiles(sorted_values, counts, probs):
+    """
+    从按列排序（NaN排在末尾）的数组中取分位数（线性插值，与pandas默认一致）
+    
+    Args:
+        sorted_values: 按列排序后的二维数组
+        counts: 各列的非缺失值数量
+        probs: 分位点列表
+    
+    Returns:
+        形状为(len(probs), 列数)的数组，没有有效值的列为NaN
+    """
+    last = np.maximum(counts - 1, 0)
+    position = np.asarray(probs, dtype=np.float64)[:, None] * last
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, last)
+    columns = np.arange(sorted_values.shape[1])
+    lower_values = sorted_values[lower, columns]
+    upper_values = sorted_values[upper, columns]
+    quantiles = lower_values + (upper_values - lower_values) * (position - lower)
+    return np.where(counts > 0, quantiles, np.nan)
+
+
+def _memoized(result_key):
+    """
+    分析方法的结果缓存：数据未变化且参数相同时，直接复用eda_results中已有的结果
+    
+    self.df被替换为另一个对象或形状变化时会自动刷新缓存；原地修改self.df的内容
+    （如替换列的值）无法被检测到，修改后必须调用invalidate()。
+    参数按方法签名绑定并补全默认值，位置参数和关键字参数的调用方式视为同一次调用。
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.df is not self._memo_df or self.df.shape != self._memo_shape:
+                self.invalidate()
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            call_args = tuple(bound.arguments.items())[1:]
+            if result_key in self.eda_results and self._memo.get(result_key) == call_args:
+                return self
+            result = method(self, *args, **kwargs)
+            self._memo[result_key] = call_args
+            return result
+        return wrapper
+    return decorator
+
 
 class EDAnalyzer:
-    def __init__(self, df, target_col='target'):
+    def __init__(self, df, target_col='target', fp32=False):
         self.df = df
         self.target_col = target_col
+        # 数值数组的精度：float32可减半内存读取量并提高矩阵运算吞吐，float64精度更高
+        self.dtype = np.float32 if fp32 else np.float64
         self.eda_results = {}
+        # 各分析方法上次计算时的数据和参数（见_memoized）
+        self._memo = {}
+        # 各线程中收集进度信息的列表（见collect_messages）
+        self._output = threading.local()
+        self._refresh_numeric_cols()
+    
+    def _print(self, message):
+        """输出进度信息；当前线程处于collect_messages中时只收集不打印"""
+        messages = getattr(self._output, 'messages', None)
+        if messages is None:
+            print(message)
+        else:
+            messages.append(message)
     
+    @contextmanager
+    def collect_messages(self, messages):
+        """
+        在当前线程中把进度信息追加到messages而不是直接打印
+        
+        多个分析方法在线程池中同时执行时使用，调用方在线程结束后按顺序输出，避免输出交错
+        """
+        self._output.messages = messages
+        try:
+            yield messages
+        finally:
+            self._output.messages = None
+    
+    def invalidate(self):
+        """
+        清空数值列、统计缓存和分析方法的结果缓存
+        
+        原地修改了self.df（与其他模块共享同一个DataFrame时也一样）之后必须调用，
+        之后再调用分析方法会基于修改后的数据重新计算。
+        """
+        return self._refresh_numeric_cols()
+    
+    def _refresh_numeric_cols(self):
+        """重新获取数值列并清空统计缓存（数据发生变化后调用）"""
+        self._numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        # 保存DataFrame对象本身而不是id()，旧对象不会被回收后id被新对象复用
+        self._memo_df = self.df
+        self._memo_shape = self.df.shape
+        self._memo.clear()
+        self._desc_stats = None
+        self.__dict__.pop('_numeric_df', None)
+        self.__dict__.pop('_numeric_array', None)
+        return self
+    
+    @cached_property
+    def _numeric_df(self):
+        """数值列组成的DataFrame（首次访问时构建，之后复用）"""
+        return self.df[self._numeric_cols]
+    
+    @cached_property
+    def _numeric_array(self):
+        """数值列的连续数组（dtype为self.dtype；首次访问时构建，之后复用；只读，避免被误修改）"""
+        values = np.ascontiguousarray(self._numeric_df.to_numpy(dtype=self.dtype, na_value=np.nan))
+        values.flags.writeable = False
+        return values
+    
+    @_memoized('basic_statistics')
     def basic_statistics(self):
         """基本统计描述"""
         # 确保目标列存在
         if self.target_col not in self.df.columns:
             raise ValueError(f"目标列 '{self.target_col}' 不存在于数据中")
         
-        # 计算统计信息
-        stats_dict = {
-            'shape': self.df.shape,
-            'dtypes': self.df.dtypes.astype(str).to_dict(),
-            'descriptive_stats': self._get_descriptive_stats(),
-            'target_distribution': self.df[self.target_col].value_counts().to_dict(),
-            'missing_values': self.df.isnull().sum().to_dict(),
-            'unique_values': {col: self.df[col].nunique() for col in self.df.columns}
-        }
+        # 目标列计数只计算一次（按数量降序，与value_counts一致）
+        target_values, target_counts = np.unique(
+            self.df[self.target_col].dropna().to_numpy(), return_counts=True
+        )
+        order = np.argsort(-target_counts, kind='stable')
+        target_values, target_counts = target_values[order], target_counts[order]
+        target_distribution = dict(zip(target_values.tolist(), target_counts.tolist()))
+
+        # 目标分布百分比（由同一组计数整体换算）
+        target_percentage = target_counts / len(self.df) * 100
+        target_percentage = dict(zip(target_values.astype(int).tolist(), target_percentage.tolist()))
         
-        # 添加目标分布百分比
-        target_counts = self.df[self.target_col].value_counts()
-        total = len(self.df)
-        stats_dict['target_percentage'] = {
-            int(k): (v / total * 100) for k, v in target_counts.items()
-        }
+        # 描述性统计表会被分布分析复用，这里先算好；其余各项只在被访问（如导出JSON）时才计算。
+        # 后续步骤可能原地替换self.df的列，因此延迟计算的部分基于当前数据的浅拷贝
+        df = self.df.copy(deep=False)
+        desc_stats = self._get_descriptive_stats()
+        shape = df.shape
+        stats_dict = LazyDict({
+            'shape': lambda: shape,
+            'dtypes': lambda: df.dtypes.astype(str).to_dict(),
+            'descriptive_stats': lambda: desc_stats.to_dict(),
+            'target_distribution': lambda: target_distribution,
+            'missing_values': lambda: df.isnull().sum().to_dict(),
+            'unique_values': lambda: df.nunique().to_dict(),
+            'target_percentage': lambda: target_percentage
+        })
         
         self.eda_results['basic_statistics'] = stats_dict
         return self
     
     def _get_descriptive_stats(self):
-        """获取描述性统计信息"""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        """获取描述性统计表（结果缓存，数据变化后由_refresh_numeric_cols清空）"""
+        if self._desc_stats is not None:
+            return self._desc_stats
+        
+        numeric_cols = self._numeric_cols
         
         if len(numeric_cols) == 0:
-            return {}
+            self._desc_stats = pd.DataFrame()
+            return self._desc_stats
+        
+        numeric_df = self._numeric_df
+        # 描述性统计始终按float64计算（fp32_eda只用于相关性和正态性检验）
+        values = self._numeric_array
+        if values.dtype != np.float64:
+            values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=0)
         
-        stats_df = self.df[numeric_cols].describe()
+        # 每列只排序一次（NaN排在末尾），最值、四分位数和中位数都从排序结果中按位置取出，
+        # 不再由describe、quantile、median各自排序
+        sorted_values = np.sort(values, axis=0)
+        q25, q50, q75 = _sorted_quantiles(sorted_values, counts, [0.25, 0.5, 0.75])
+        minimum, maximum = _sorted_quantiles(sorted_values, counts, [0.0, 1.0])
         
-        # 添加额外的统计量
-        for col in numeric_cols:
-            data = self.df[col].dropna()
-            if len(data) > 0:
-                stats_df.loc['skew', col] = data.skew()
-                stats_df.loc['kurtosis', col] = data.kurtosis()
-                stats_df.loc['median', col] = data.median()
-                stats_df.loc['iqr', col] = data.quantile(0.75) - data.quantile(0.25)
+        # 均值和标准差不需要排序，仍由pandas按列计算（与describe()结果一致）
+        mean = numeric_df.mean().to_numpy()
+        std = numeric_df.std().to_numpy()
+        
+        # 与describe()相同的行结构
+        stats_df = pd.DataFrame(
+            [counts.astype(np.float64), mean, std, minimum, q25, q50, q75, maximum],
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+            columns=numeric_df.columns
+        )
+
+        # 添加额外的统计量（整表计算，缺失值自动跳过）
+        stats_df.loc['skew'] = numeric_df.skew()
+        stats_df.loc['kurtosis'] = numeric_df.kurtosis()
+        stats_df.loc['median'] = q50
+        stats_df.loc['iqr'] = q75 - q25
         
-        return stats_df.to_dict()
+        # 缓存结果，供分布分析复用
+        self._desc_stats = stats_df
+        return stats_df
     
-    def correlation_analysis(self):
-        """相关性分析"""
-        print("开始相关性分析...")
+    @_memoized('correlation')
+    def correlation_analysis(self, include_matrix=True):
+        """
+        相关性分析
+        
+        Args:
+            include_matrix: 是否计算完整相关性矩阵，为False时只计算各特征与目标列的相关性
+        """
+        self._print("开始相关性分析...")
         
         # 只选择数值列
-        numeric_df = self.df.select_dtypes(include=[np.number])
+        numeric_cols = list(self._numeric_cols)
         
-        if len(numeric_df.columns) == 0:
-            print("警告: 没有数值列可用于相关性分析")
-            self.eda_results['correlation'] = {
-                'matrix': {},
-                'top_features_with_target': []
-            }
+        if len(numeric_cols) == 0:
+            self._print("警告: 没有数值列可用于相关性分析")
+            self.eda_results['correlation'] = self._empty_correlation()
             return self
         
         # 检查目标列是否在数值列中
-        if self.target_col not in numeric_df.columns:
-            print(f"警告: 目标列 '{self.target_col}' 不在数值列中")
-            # 将目标列添加到numeric_df中
+        if self.target_col in numeric_cols:
+            numeric_df = self._numeric_df
+        else:
+            self._print(f"警告: 目标列 '{self.target_col}' 不在数值列中")
+            # 将目标列加入待选列，直接按列名选取，避免concat复制整个数据块
             if self.target_col in self.df.columns:
-                numeric_df = pd.concat([numeric_df, self.df[self.target_col]], axis=1)
+                numeric_df = self.df[numeric_cols + [self.target_col]]
             else:
-                print(f"错误: 目标列 '{self.target_col}' 不存在")
-                self.eda_results['correlation'] = {
-                    'matrix': {},
-                    'top_features_with_target': []
-                }
+                self._print(f"错误: 目标列 '{self.target_col}' 不存在")
+                self.eda_results['correlation'] = self._empty_correlation()
                 return self
         
-        # 计算相关性矩阵
-        correlation_matrix = numeric_df.corr()
-        print(f"相关性矩阵形状: {correlation_matrix.shape}")
+        if include_matrix:
+            if numeric_df is self._numeric_df:
+                values = self._numeric_array
+            else:
+                values = np.ascontiguousarray(numeric_df.to_numpy(dtype=self.dtype, na_value=np.nan))
+            if not np.isnan(values).any():
+                # 无缺失值时直接用np.corrcoef，一次矩阵乘法得到整个相关性矩阵（按数组自身精度计算）
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    corr = np.corrcoef(values, rowvar=False, dtype=values.dtype)
+                correlation_matrix = pd.DataFrame(
+                    corr.astype(np.float64, copy=False), index=numeric_df.columns, columns=numeric_df.columns
+                )
+            elif NaNCorrMp is not None:
+                # 有缺失值时需要成对删除（安装了nancorrmp时多核并行计算）
+                correlation_matrix = NaNCorrMp.calculate(numeric_df, n_jobs=-1)
+            else:
+                correlation_matrix = numeric_df.corr()
+            self._print(f"相关性矩阵形状: {correlation_matrix.shape}")
+            # 直接从矩阵数组中取出目标列（去掉目标列自身）
+            target_idx = correlation_matrix.columns.get_loc(self.target_col)
+            others = np.arange(len(correlation_matrix.columns)) != target_idx
+            feature_names = correlation_matrix.columns[others]
+            target_corr = correlation_matrix.to_numpy()[others, target_idx]
+        else:
+            # 只计算与目标列的相关性，不构建完整矩阵
+            correlation_matrix = None
+            target_corr_series = self._target_correlations(numeric_df)
+            feature_names = target_corr_series.index
+            target_corr = target_corr_series.to_numpy()
         
         # 获取与目标列相关性最高的特征
-        if self.target_col in correlation_matrix.columns:
-            target_corr = correlation_matrix[self.target_col].drop(self.target_col, errors='ignore')
+        if len(target_corr) > 0:
+            # 按绝对值取前10个（NaN排在最后）
+            abs_corr = np.abs(target_corr)
+            sort_key = np.where(np.isnan(abs_corr), -np.inf, abs_corr)
+            k = min(10, len(sort_key))
+            top_idx = np.argpartition(-sort_key, k - 1)[:k]
+            top_idx = top_idx[np.argsort(-sort_key[top_idx], kind='stable')]
             
-            if len(target_corr) > 0:
-                # 按绝对值排序
-                top_correlations = target_corr.abs().sort_values(ascending=False).head(10)
-                
-                # 格式化为字典列表
-                top_corr_list = []
-                for feature, corr_value in top_correlations.items():
-                    top_corr_list.append({
-                        'feature1': self.target_col,
-                        'feature2': feature,
-                        'correlation': float(corr_value)
-                    })
-                
-                print(f"找到 {len(top_corr_list)} 个与目标相关的特征")
-            else:
-                print("警告: 没有找到与目标列相关的特征")
-                top_corr_list = []
+            # 格式化为字典列表
+            top_corr_list = []
+            for feature, corr_value in zip(feature_names[top_idx], abs_corr[top_idx]):
+                top_corr_list.append({
+                    'feature1': self.target_col,
+                    'feature2': feature,
+                    'correlation': float(corr_value)
+                })
+            
+            self._print(f"找到 {len(top_corr_list)} 个与目标相关的特征")
         else:
-            print(f"警告: 目标列 '{self.target_col}' 不在相关性矩阵中")
+            self._print("警告: 没有找到与目标列相关的特征")
             top_corr_list = []
         
-        self.eda_results['correlation'] = {
-            'matrix': correlation_matrix.to_dict(),
-            'top_features_with_target': top_corr_list
-        }
+        # 矩阵以float32数组+列名保存，需要嵌套字典时再调用correlation_matrix_as_dict
+        if correlation_matrix is not None:
+            self.eda_results['correlation'] = {
+                'matrix_values': correlation_matrix.to_numpy(dtype=np.float32),
+                'matrix_columns': list(correlation_matrix.columns),
+                'top_features_with_target': top_corr_list
+            }
+        else:
+            self.eda_results['correlation'] = self._empty_correlation()
+            self.eda_results['correlation']['top_features_with_target'] = top_corr_list
         
-        print("相关性分析完成")
+        self._print("相关性分析完成")
         return self
     
+    @staticmethod
+    def _empty_correlation():
+        """没有相关性矩阵时的默认结果"""
+        return {
+            'matrix_values': np.empty((0, 0), dtype=np.float32),
+            'matrix_columns': [],
+            'top_features_with_target': []
+        }
+    
+    def correlation_matrix_as_dict(self):
+        """按需把相关性矩阵转换为嵌套字典（格式与DataFrame.to_dict()一致）"""
+        corr = self.eda_results.get('correlation', {})
+        columns = corr.get('matrix_columns', [])
+        if not columns:
+            return {}
+        values = corr['matrix_values'].astype(np.float64)
+        return pd.DataFrame(values, index=columns, columns=columns).to_dict()
+    
+    def _target_correlations(self, numeric_df):
+        """计算各特征与目标列的Pearson相关系数（成对删除缺失值，与DataFrame.corr一致）"""
+        features = numeric_df.drop(columns=[self.target_col])
+        X = features.to_numpy(dtype=np.float64, na_value=np.nan)
+        y = numeric_df[self.target_col].to_numpy(dtype=np.float64, na_value=np.nan)[:, None]
+        valid = ~np.isnan(X) & ~np.isnan(y)
+        n = valid.sum(axis=0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            X_centered = np.where(valid, X - np.where(valid, X, 0.0).sum(axis=0) / n, 0.0)
+            y_centered = np.where(valid, y - np.where(valid, y, 0.0).sum(axis=0) / n, 0.0)
+            numerator = np.einsum('ij,ij->j', X_centered, y_centered)
+            denominator = np.sqrt(
+                np.einsum('ij,ij->j', X_centered, X_centered) * np.einsum('ij,ij->j', y_centered, y_centered)
+            )
+            corr = np.clip(numerator / denominator, -1.0, 1.0)
+        
+        return pd.Series(corr, index=features.columns)
+    
+    @_memoized('distributions')
     def distribution_analysis(self):
         """分布分析"""
-        print("开始分布分析...")
+        self._print("开始分布分析...")
         distributions = {}
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        numeric_cols = self._numeric_cols
         
         # 只分析前10个数值列，避免太多
         cols_to_analyze = list(numeric_cols)[:10]
-        print(f"将分析 {len(cols_to_analyze)} 个特征的分布")
+        self._print(f"将分析 {len(cols_to_analyze)} 个特征的分布")
+        
+        # 基本统计直接复用描述性统计的结果，不再逐列重新计算
+        desc_stats = self._get_descriptive_stats()
+        
+        # Shapiro检验需要至少3个样本
+        valid_cols = pd.Index([col for col in cols_to_analyze if desc_stats.loc['count', col] >= 3])
+        if len(valid_cols) > 0:
+            # 所有列的统计量一次性从描述性统计表中取出，不再逐列逐项查找
+            summary = desc_stats.loc[list(DISTRIBUTION_STATS), valid_cols].rename(index=DISTRIBUTION_STATS)
+            distributions = summary.astype(np.float64).to_dict()
         
-        for col in cols_to_analyze:
-            data = self.df[col].dropna()
-            if len(data) < 3:  # Shapiro检验需要至少3个样本
-                continue
+        # 正态性检验（Shapiro-Wilk）：所有列一次批量检验
+        if len(valid_cols) > 0:
+            # 从缓存的数值数组中按位置取列（花式索引得到新的可写数组）；
+            # SciPy内部以float64计算，这里直接转换为float64
+            block = self._numeric_array[:, self._numeric_cols.get_indexer(valid_cols)].astype(np.float64, copy=False)
+            counts = desc_stats.loc['count', valid_cols].to_numpy()
+            large = counts > MAX_NORM_N
+            # 由已有的非缺失计数一次判断哪些列没有缺失值，这些列不需要再逐列生成缺失掩码
+            complete = counts == len(self.df)
             
-            try:
-                # 基本统计
-                distributions[col] = {
-                    'mean': float(data.mean()),
-                    'std': float(data.std()),
-                    'skewness': float(data.skew()),
-                    'kurtosis': float(data.kurtosis()),
-                    'median': float(data.median()),
-                    'min': float(data.min()),
-                    'max': float(data.max())
-                }
-                
-                # 正态性检验（Shapiro-Wilk）
-                if len(data) <= 5000:  # Shapiro检验最多支持5000个样本
-                    try:
-                        shapiro_test = stats.shapiro(data)
-                        distributions[col]['normality_test'] = {
-                            'statistic': float(shapiro_test.statistic),
-                            'p_value': float(shapiro_test.pvalue)
-                        }
-                    except Exception as e:
-                        print(f"Shapiro检验失败 ({col}): {str(e)}")
-                        distributions[col]['normality_test'] = {
-                            'statistic': None,
-                            'p_value': None
-                        }
-                else:
-                    # 对于大样本，使用Kolmogorov-Smirnov检验
-                    try:
-                        ks_test = stats.kstest(data, 'norm', args=(data.mean(), data.std()))
-                        distributions[col]['normality_test'] = {
-                            'statistic': float(ks_test.statistic),
-                            'p_value': float(ks_test.pvalue)
-                        }
-                    except Exception as e:
-                        print(f"KS检验失败 ({col}): {str(e)}")
-                        distributions[col]['normality_test'] = {
-                            'statistic': None,
-                            'p_value': None
-                        }
-                        
-            except Exception as e:
-                # 如果检验失败，只记录基本统计量
-                print(f"分布分析失败 ({col}): {str(e)}")
-                distributions[col] = {
-                    'mean': float(data.mean()) if len(data) > 0 else 0,
-                    'std': float(data.std()) if len(data) > 0 else 0,
-                    'skewness': float(data.skew()) if len(data) > 0 else 0,
-                    'kurtosis': float(data.kurtosis()) if len(data) > 0 else 0,
-                    'normality_test': {
-                        'statistic': None,
-                        'p_value': None
-                    }
-                }
+            # Shapiro检验最多支持5000个样本：大样本列随机抽取MAX_NORM_N个样本放在列首，
+            # 其余位置置为NaN（检验时忽略），从而和其他列一起在一次调用中完成
+            if large.any():
+                rng = np.random.default_rng(42)
+                for j in np.flatnonzero(large):
+                    column = block[:, j]
+                    values = column if complete[j] else column[~np.isnan(column)]
+                    sample = rng.choice(values, size=MAX_NORM_N, replace=False)
+                    block[:MAX_NORM_N, j] = sample
+                    block[MAX_NORM_N:, j] = np.nan
+                complete &= ~large
+            
+            normality_tests = self._batch_shapiro(valid_cols, block, complete)
+            for col, test in normality_tests.items():
+                distributions[col]['normality_test'] = test
         
         self.eda_results['distributions'] = distributions
-        print(f"分布分析完成，分析了 {len(distributions)} 个特征")
+        self._print(f"分布分析完成，分析了 {len(distributions)} 个特征")
         return self
     
+    def _batch_shapiro(self, cols, block, complete):
+        """对block的每一列批量执行Shapiro-Wilk检验（complete标记不含NaN的列）"""
+        try:
+            try:
+                # 所有列都没有缺失值时不需要SciPy按列处理NaN
+                nan_policy = 'propagate' if complete.all() else 'omit'
+                result = stats.shapiro(block, axis=0, nan_policy=nan_policy)
+                statistics, p_values = np.atleast_1d(result.statistic), np.atleast_1d(result.pvalue)
+            except TypeError:
+                # 旧版SciPy不支持axis参数，逐列检验（各列相互独立，有joblib时用线程并行，避免进程创建开销）
+                columns = [
+                    column if is_complete else column[~np.isnan(column)]
+                    for column, is_complete in zip(block.T, complete)
+                ]
+                if Parallel is not None:
+                    results = Parallel(n_jobs=-1, prefer='threads')(delayed(stats.shapiro)(column) for column in columns)
+                else:
+                    results = [stats.shapiro(column) for column in columns]
+                statistics = [r.statistic for r in results]
+                p_values = [r.pvalue for r in results]
+            return {
+                col: {'statistic': float(statistic), 'p_value': float(p_value)}
+                for col, statistic, p_value in zip(cols, statistics, p_values)
+            }
+        except Exception as e:
+            self._print(f"Shapiro检验失败: {str(e)}")
+            return {col: {'statistic': None, 'p_value': None} for col in cols}
+    
     def get_eda_results(self):
         """获取EDA结果"""
         return self.eda_results
\ No newline at end of file
@@ -1,63 +1,150 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.decomposition import PCA
-from sklearn.feature_selection import SelectKBest, f_classif
 from sklearn.ensemble import RandomForestClassifier
+from scipy import stats
+
+try:
+    # 可选依赖：基于直方图的梯度提升树
+    import lightgbm
+except ImportError:
+    lightgbm = None
+
+
+def _anova_f_scores(X, y):
+    """一次性计算所有特征的单因素ANOVA F值和p值（与sklearn的f_classif一致）"""
+    classes, inverse = np.unique(y, return_inverse=True)
+    n_samples, n_classes = X.shape[0], len(classes)
+    
+    # 组均值通过one-hot矩阵乘法一次得到
+    groups = np.eye(n_classes, dtype=X.dtype)[inverse]
+    counts = groups.sum(axis=0)
+    class_means = (groups.T @ X) / counts[:, None]
+    overall_mean = X.mean(axis=0)
+    
+    ss_between = (counts[:, None] * (class_means - overall_mean) ** 2).sum(axis=0)
+    ss_total = ((X - overall_mean) ** 2).sum(axis=0)
+    ss_within = ss_total - ss_between
+    df_between, df_within = n_classes - 1, n_samples - n_classes
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_scores = (ss_between / df_between) / (ss_within / df_within)
+    p_values = stats.f.sf(f_scores, df_between, df_within)
+    return f_scores, p_values
+
 
 class FeatureEngineer:
     def __init__(self, df, target_col='target'):
         self.df = df
         self.target_col = target_col
         self.feature_importance = {}
+        self.tree_model = None  # feature_selection_rf实际使用的树模型名
+        # 特征矩阵缓存，供各特征选择方法复用
+        self._cached_df = None
+        self._X_np = None
+        self._y_np = None
+        self._X_cols = None
+    
+    def _materialize(self):
+        """获取（并缓存）特征矩阵、目标向量和特征列名，self.df被替换时重新构建"""
+        if self._X_np is None or self._cached_df is not self.df:
+            self._X_cols = [col for col in self.df.columns if col != self.target_col]
+            self._X_np = self.df[self._X_cols].to_numpy(dtype=np.float64)
+            self._y_np = self.df[self.target_col].to_numpy()
+            self._cached_df = self.df
+        return self._X_np, self._y_np, self._X_cols
     
     def scale_features(self, method='standard'):
         """特征标准化"""
         numeric_cols = self.df.select_dtypes(include=[np.number]).columns
         numeric_cols = [col for col in numeric_cols if col != self.target_col]
         
+        if method not in ('standard', 'minmax'):
+            return self
+        
+        # 直接在NumPy数组上原地缩放，避免sklearn的输入校验和额外拷贝
+        block = self.df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
         if method == 'standard':
-            scaler = StandardScaler()
-        elif method == 'minmax':
-            scaler = MinMaxScaler()
+            center = np.nanmean(block, axis=0)
+            scale = np.nanstd(block, axis=0)
         else:
+            center = np.nanmin(block, axis=0)
+            scale = np.nanmax(block, axis=0) - center
+        scale[scale == 0] = 1.0
+        
+        # 数据已经是标准化/归一化后的结果时（中心约为0、尺度约为1）直接跳过
+        if np.allclose(center, 0, atol=1e-3) and np.allclose(scale, 1, atol=1e-2):
             return self
         
-        scaled_features = scaler.fit_transform(self.df[numeric_cols])
-        self.df[numeric_cols] = scaled_features
+        np.subtract(block, center, out=block)
+        np.divide(block, scale, out=block)
+        self.df[numeric_cols] = block
+        
+        # 所有特征都是数值列时，缩放结果直接作为特征缓存，否则让缓存失效
+        if numeric_cols == [col for col in self.df.columns if col != self.target_col]:
+            self._X_np, self._y_np, self._X_cols = block, self.df[self.target_col].to_numpy(), numeric_cols
+            self._cached_df = self.df
+        else:
+            self._X_np = None
         return self
     
     def feature_selection_anova(self, k=10):
         """使用ANOVA进行特征选择"""
-        X = self.df.drop(columns=[self.target_col])
-        y = self.df[self.target_col]
+        X, y, feature_cols = self._materialize()
         
-        selector = SelectKBest(score_func=f_classif, k=min(k, len(X.columns)))
-        selector.fit(X, y)
+        scores, p_values = _anova_f_scores(X, y)
+        
+        # 与SelectKBest相同：NaN得分视为最低，取得分最高的k个
+        k = min(k, len(feature_cols))
+        selected = np.zeros(len(feature_cols), dtype=bool)
+        if k > 0:
+            ranking_scores = np.where(np.isnan(scores), np.finfo(np.float64).min, scores)
+            selected[np.argsort(ranking_scores, kind='mergesort')[-k:]] = True
         
         feature_scores = {}
-        for i, col in enumerate(X.columns):
+        for i, col in enumerate(feature_cols):
             feature_scores[col] = {
-                'score': float(selector.scores_[i]) if i < len(selector.scores_) else 0,
-                'p_value': float(selector.pvalues_[i]) if i < len(selector.pvalues_) else 1,
-                'selected': col in X.columns[selector.get_support()]
+                'score': float(scores[i]),
+                'p_value': float(p_values[i]),
+                'selected': bool(selected[i])
             }
         
         self.feature_importance['anova'] = feature_scores
         return self
     
-    def feature_selection_rf(self):
-        """使用随机森林进行特征选择"""
-        X = self.df.drop(columns=[self.target_col])
-        y = self.df[self.target_col]
+    def feature_selection_rf(self, model='random_forest'):
+        """
+        使用树模型进行特征选择
+        
+        Args:
+            model: 'random_forest'使用随机森林；'lightgbm'使用直方图梯度提升树（未安装LightGBM时回退到随机森林）
         
-        rf = RandomForestClassifier(n_estimators=100, random_state=42)
-        rf.fit(X, y)
+        树模型不受特征缩放影响，可以在scale_features之前调用；实际使用的模型名记录在self.tree_model中，
+        重要性结果保存在feature_importance[self.tree_model]下
+        """
+        X, y, feature_cols = self._materialize()
+        
+        if model == 'lightgbm' and lightgbm is not None:
+            # 特征预先分箱为直方图，分裂查找只需遍历各箱而无需排序，宽表上明显快于随机森林
+            lgbm = lightgbm.LGBMClassifier(
+                n_estimators=100, importance_type='gain', random_state=42, n_jobs=-1, verbose=-1
+            )
+            lgbm.fit(X, y)
+            importances = lgbm.feature_importances_
+            # 归一化为总和为1，与随机森林的重要性口径一致
+            if importances.sum() > 0:
+                importances = importances / importances.sum()
+            tree_model = 'lightgbm'
+        else:
+            rf = RandomForestClassifier(n_estimators=100, random_state=42)
+            rf.fit(X, y)
+            importances = rf.feature_importances_
+            tree_model = 'random_forest'
         
         feature_scores = {}
-        for i, col in enumerate(X.columns):
+        for i, col in enumerate(feature_cols):
             feature_scores[col] = {
-                'importance': float(rf.feature_importances_[i]),
+                'importance': float(importances[i]),
                 'rank': i + 1
             }
         
@@ -65,5 +152,6 @@ class FeatureEngineer:
                                 key=lambda x: x[1]['importance'], 
                                 reverse=True)
         
-        self.feature_importance['random_forest'] = dict(sorted_features[:15])
+        self.feature_importance[tree_model] = dict(sorted_features[:15])
+        self.tree_model = tree_model
         return self
\ No newline at end of file
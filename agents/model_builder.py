@@ -1,19 +1,27 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.svm import SVC
-from sklearn.metrics import (accuracy_score, precision_score, recall_score, 
-                           f1_score, roc_auc_score, confusion_matrix)
+from sklearn.metrics import precision_recall_fscore_support, roc_auc_score, confusion_matrix
+
+
+def _fit_model(name, model, X, y):
+    """在工作进程中训练单个模型"""
+    return name, model.fit(X, y)
+
 
 class ModelBuilder:
-    def __init__(self, df, target_col='target', test_size=0.2, random_state=42):
+    def __init__(self, df, target_col='target', test_size=0.2, random_state=42, n_jobs=-1):
         self.df = df
         self.target_col = target_col
         self.test_size = test_size
         self.random_state = random_state
+        self.n_jobs = n_jobs
         self.models = {}
         self.results = {}
     
@@ -25,6 +33,12 @@ class ModelBuilder:
         self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
             X, y, test_size=self.test_size, random_state=self.random_state, stratify=y
         )
+        
+        # 只转换一次为连续的float32数组，避免每次fit/predict时sklearn重复校验和拷贝DataFrame
+        self.X_train_np = np.ascontiguousarray(self.X_train.to_numpy(dtype=np.float32))
+        self.X_test_np = np.ascontiguousarray(self.X_test.to_numpy(dtype=np.float32))
+        self.y_train_np = self.y_train.to_numpy()
+        self.y_test_np = self.y_test.to_numpy()
         return self
     
     def train_models(self):
@@ -32,32 +46,48 @@ class ModelBuilder:
         model_configs = {
             'logistic_regression': LogisticRegression(max_iter=1000, random_state=self.random_state),
             'decision_tree': DecisionTreeClassifier(random_state=self.random_state),
-            'random_forest': RandomForestClassifier(n_estimators=100, random_state=self.random_state),
+            # 外层已按模型并行，模型内部使用单线程避免线程过载
+            'random_forest': RandomForestClassifier(n_estimators=100, random_state=self.random_state, n_jobs=1),
             'gradient_boosting': GradientBoostingClassifier(random_state=self.random_state),
-            'svm': SVC(probability=True, random_state=self.random_state)
+            # AUC只依赖排序，直接用decision_function计算，省去Platt缩放的内部交叉验证
+            'svm': SVC(random_state=self.random_state)
         }
         
-        for name, model in model_configs.items():
-            model.fit(self.X_train, self.y_train)
-            self.models[name] = model
+        # 各模型相互独立，按模型并行训练
+        fitted = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_model)(name, clone(model), self.X_train_np, self.y_train_np)
+            for name, model in model_configs.items()
+        )
+        self.models.update(fitted)
         return self
     
     def evaluate_models(self):
         """评估模型性能"""
         for name, model in self.models.items():
-            y_pred = model.predict(self.X_test)
-            y_pred_proba = model.predict_proba(self.X_test)[:, 1] if hasattr(model, 'predict_proba') else None
+            y_pred = model.predict(self.X_test_np)
+            if hasattr(model, 'predict_proba'):
+                y_score = model.predict_proba(self.X_test_np)[:, 1]
+            elif hasattr(model, 'decision_function'):
+                y_score = model.decision_function(self.X_test_np)
+            else:
+                y_score = None
+            
+            # 混淆矩阵只计算一次，准确率由其对角线得到
+            cm = confusion_matrix(self.y_test_np, y_pred)
+            precision, recall, f1, _ = precision_recall_fscore_support(
+                self.y_test_np, y_pred, average='weighted', zero_division=0
+            )
             
             metrics = {
-                'accuracy': accuracy_score(self.y_test, y_pred),
-                'precision': precision_score(self.y_test, y_pred, average='weighted'),
-                'recall': recall_score(self.y_test, y_pred, average='weighted'),
-                'f1_score': f1_score(self.y_test, y_pred, average='weighted'),
-                'confusion_matrix': confusion_matrix(self.y_test, y_pred).tolist()
+                'accuracy': float(np.trace(cm) / cm.sum()),
+                'precision': float(precision),
+                'recall': float(recall),
+                'f1_score': float(f1),
+                'confusion_matrix': cm.tolist()
             }
             
-            if y_pred_proba is not None:
-                metrics['roc_auc'] = roc_auc_score(self.y_test, y_pred_proba)
+            if y_score is not None:
+                metrics['roc_auc'] = roc_auc_score(self.y_test_np, y_score)
             
             self.results[name] = metrics
         return self
@@ -65,8 +95,13 @@ class ModelBuilder:
     def cross_validation(self, cv=5):
         """交叉验证"""
         cv_results = {}
-        for name, model in self.models.items():
-            scores = cross_val_score(model, self.X_train, self.y_train, cv=cv, scoring='accuracy')
+        # 所有模型共用同一组划分，按模型并行（内部单进程，避免嵌套并行）
+        splitter = StratifiedKFold(n_splits=cv)
+        all_scores = Parallel(n_jobs=self.n_jobs)(
+            delayed(cross_val_score)(model, self.X_train_np, self.y_train_np, cv=splitter, scoring='accuracy', n_jobs=1)
+            for model in self.models.values()
+        )
+        for name, scores in zip(self.models, all_scores):
             cv_results[name] = {
                 'mean_score': scores.mean(),
                 'std_score': scores.std(),
@@ -1,132 +1,24 @@
-from jinja2 import Template
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache, StrictUndefined
 import markdown
 from datetime import datetime
-import json
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import threading
 
-class ReportGenerator:
-    def __init__(self, analysis_results):
-        self.results = analysis_results
-        self.report_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    def _get_nested_value(self, data, keys, default=None):
-        """安全获取嵌套字典的值"""
-        if isinstance(keys, str):
-            keys = keys.split('.')
-        
-        current = data
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                return default
-        return current
-    
-    def generate_markdown(self):
-        """生成Markdown格式报告"""
-        # 使用调试信息查看数据结构
-        debug_info = {
-            'eda_keys': list(self.results.get('eda', {}).keys()) if self.results.get('eda') else [],
-            'eda_structure': json.dumps(self.results.get('eda', {}), indent=2, default=str) if self.results.get('eda') else 'No EDA data'
-        }
-        
-        # 1. 基本数据信息
-        data_info = self.results.get('data_info', {})
-        benign_count = data_info.get('benign_count', 0)
-        malignant_count = data_info.get('malignant_count', 0)
-        benign_percentage = data_info.get('benign_percentage', 0)
-        malignant_percentage = data_info.get('malignant_percentage', 0)
-        
-        # 2. 数据清洗信息
-        cleaning = self.results.get('cleaning', {})
-        missing_values = cleaning.get('missing_values', {})
-        missing_counts = missing_values.get('counts', {}) if isinstance(missing_values, dict) else {}
-        missing_percentages = missing_values.get('percentages', {}) if isinstance(missing_values, dict) else {}
-        outliers = cleaning.get('outliers', {})
-        
-        # 3. EDA信息 - 直接使用原始数据，不进行复杂的提取
-        eda_data = self.results.get('eda', {})
-        
-        # 尝试不同的访问路径获取EDA数据
-        basic_stats = None
-        correlation_results = []
-        
-        # 尝试获取基本统计信息
-        if 'basic_statistics' in eda_data:
-            basic_stats = eda_data['basic_statistics']
-        elif 'basic_stats' in eda_data:
-            basic_stats = eda_data['basic_stats']
-        
-        # 尝试获取相关性分析结果
-        if 'correlation' in eda_data:
-            corr_data = eda_data['correlation']
-            if isinstance(corr_data, dict) and 'top_features_with_target' in corr_data:
-                correlation_results = corr_data['top_features_with_target']
-            elif isinstance(corr_data, list):
-                correlation_results = corr_data
-        
-        # 4. 特征重要性
-        feature_importance = self.results.get('feature_importance', {})
-        rf_features = feature_importance.get('random_forest', {})
-        
-        # 5. 模型结果
-        modeling_results = self.results.get('modeling', {})
-        model_table_data = []
-        
-        # 提取模型性能数据
-        for model_name, metrics in modeling_results.items():
-            if model_name == 'cross_validation' or not isinstance(metrics, dict):
-                continue
-            
-            # 提取指标
-            accuracy = metrics.get('accuracy', 0)
-            precision = metrics.get('precision_weighted', metrics.get('precision_macro', metrics.get('precision', 0)))
-            recall = metrics.get('recall_weighted', metrics.get('recall_macro', metrics.get('recall', 0)))
-            f1 = metrics.get('f1_score_weighted', metrics.get('f1_score_macro', metrics.get('f1_score', 0)))
-            auc = metrics.get('roc_auc', 0)
-            
-            model_table_data.append({
-                'name': model_name.replace('_', ' ').title(),
-                'accuracy': f"{accuracy:.3f}" if isinstance(accuracy, (int, float)) else "0.000",
-                'precision': f"{precision:.3f}" if isinstance(precision, (int, float)) else "0.000",
-                'recall': f"{recall:.3f}" if isinstance(recall, (int, float)) else "0.000",
-                'f1': f"{f1:.3f}" if isinstance(f1, (int, float)) else "0.000",
-                'auc': f"{auc:.3f}" if isinstance(auc, (int, float)) else "0.000"
-            })
-        
-        # 6. 交叉验证数据
-        cv_data = []
-        cv_results = modeling_results.get('cross_validation', {})
-        for model_name, cv_metrics in cv_results.items():
-            if isinstance(cv_metrics, dict):
-                mean_score = cv_metrics.get('mean_score', 0)
-                std_score = cv_metrics.get('std_score', 0)
-                
-                cv_data.append({
-                    'name': model_name.replace('_', ' ').title(),
-                    'mean': f"{mean_score:.3f}",
-                    'std': f"{std_score:.3f}"
-                })
-        
-        # 7. 洞见和建议
-        insights = self.results.get('insights', [])
-        recommendations = self.results.get('recommendations', [])
-        
-        template_content = """
+# Markdown报告模板
+MARKDOWN_TEMPLATE_CONTENT = """
 # Kaggle乳腺癌数据分析报告
 
 **报告生成时间**: {{ report_date }}
 
-{% if debug_info.eda_keys %}
-<!-- 调试信息: EDA键值: {{ debug_info.eda_keys }} -->
-{% endif %}
-
 ## 1. 数据集概览
 
 ### 1.1 基本信息
 - **数据来源**: Kaggle乳腺癌数据集
-- **数据形状**: {{ data_info.shape | default("N/A") }}
-- **特征数量**: {{ data_info.feature_count | default("N/A") }}
-- **样本数量**: {{ data_info.sample_count | default("N/A") }}
+- **数据形状**: {{ data_shape }}
+- **特征数量**: {{ feature_count }}
+- **样本数量**: {{ sample_count }}
 - **目标变量分布**:
   - **良性 (B)**: {{ benign_count }} 个样本 ({{ "%.1f"|format(benign_percentage) }}%)
   - **恶性 (M)**: {{ malignant_count }} 个样本 ({{ "%.1f"|format(malignant_percentage) }}%)
@@ -157,12 +49,12 @@ class ReportGenerator:
 
 ### 3.1 基本统计信息
 {% if basic_stats %}
-{% if basic_stats.shape %}
-- 数据集形状: {{ basic_stats.shape }}
+{% if basic_shape %}
+- 数据集形状: {{ basic_shape }}
 {% endif %}
-{% if basic_stats.target_distribution %}
+{% if target_distribution %}
 - 目标变量分布: 
-  {% for target, count in basic_stats.target_distribution.items() %}
+  {% for target, count in target_distribution.items() %}
     {% if target == 0 or target == '0' %}良性: {{ count }} 个样本
     {% elif target == 1 or target == '1' %}恶性: {{ count }} 个样本
     {% else %}类别{{ target }}: {{ count }} 个样本{% endif %}
@@ -186,16 +78,10 @@ class ReportGenerator:
 
 ## 4. 特征重要性分析
 
-### 4.1 基于随机森林的特征重要性排名
+### 4.1 基于{{ tree_model_name }}的特征重要性排名
 {% if rf_features %}
 {% for feature, importance in rf_features.items() %}
-{% if loop.index <= 10 %}
-{% if importance is mapping %}
-{{ loop.index }}. **{{ feature }}**: {{ "%.4f"|format(importance.get('importance', importance)) }}
-{% else %}
-{{ loop.index }}. **{{ feature }}**: {{ "%.4f"|format(importance) }}
-{% endif %}
-{% endif %}
+{{ loop.index }}. **{{ feature }}**: {{ importance }}
 {% endfor %}
 {% else %}
 - 特征重要性分析结果不可用
@@ -229,7 +115,7 @@ class ReportGenerator:
 {{ loop.index }}. {{ insight }}
 {% endfor %}
 {% else %}
-1. 数据集包含 {{ data_info.sample_count | default("未知数量") }} 个样本
+1. 数据集包含 {{ sample_count_text }} 个样本
 2. 数据质量分析完成
 3. 机器学习模型训练完成
 {% endif %}
@@ -292,45 +178,9 @@ class ReportGenerator:
 **版本**: 1.0
 **生成时间**: {{ report_date }}
 """
-        
-        template = Template(template_content)
-        markdown_report = template.render(
-            report_date=self.report_date,
-            data_info=data_info,
-            benign_count=benign_count,
-            malignant_count=malignant_count,
-            benign_percentage=benign_percentage,
-            malignant_percentage=malignant_percentage,
-            missing_counts=missing_counts,
-            missing_percentages=missing_percentages,
-            outliers=outliers,
-            basic_stats=basic_stats,
-            correlation_results=correlation_results,
-            rf_features=rf_features,
-            model_table_data=model_table_data,
-            cv_data=cv_data,
-            insights=insights,
-            recommendations=recommendations,
-            debug_info=debug_info
-        )
-        
-        return markdown_report
-    
-    def generate_html(self, markdown_report):
-        """将Markdown转换为HTML"""
-        # 移除调试信息
-        lines = markdown_report.split('\n')
-        clean_lines = [line for line in lines if not line.strip().startswith('<!-- 调试信息') and not line.strip().endswith('-->')]
-        clean_markdown = '\n'.join(clean_lines)
-        
-        # 转换Markdown为HTML
-        html_content = markdown.markdown(
-            clean_markdown, 
-            extensions=['tables', 'fenced_code']
-        )
-        
-        # 创建完整的HTML页面
-        html_template = """
+
+# HTML报告页面模板
+HTML_TEMPLATE_CONTENT = """
         <!DOCTYPE html>
         <html lang="zh-CN">
         <head>
@@ -573,8 +423,214 @@ class ReportGenerator:
         </body>
         </html>
         """
+
+# 报告表格各列对应的指标名（按优先级排列）
+MODEL_TABLE_METRICS = {
+    'accuracy': ['accuracy'],
+    'precision': ['precision_weighted', 'precision_macro', 'precision'],
+    'recall': ['recall_weighted', 'recall_macro', 'recall'],
+    'f1': ['f1_score_weighted', 'f1_score_macro', 'f1_score'],
+    'auc': ['roc_auc']
+}
+CV_TABLE_METRICS = {
+    'mean': ['mean_score'],
+    'std': ['std_score']
+}
+
+# 特征重要性所用树模型在报告中的名称
+TREE_MODEL_NAMES = {
+    'random_forest': '随机森林',
+    'lightgbm': 'LightGBM'
+}
+
+_ENV = Environment(
+    loader=DictLoader({
+        'report.md': MARKDOWN_TEMPLATE_CONTENT,
+        'report.html': HTML_TEMPLATE_CONTENT
+    }),
+    # 编译后的模板字节码缓存到磁盘，新进程启动时无需重新编译；
+    # 不指定目录时使用Jinja为当前用户创建的私有临时目录（权限0700并检查所有者）
+    bytecode_cache=FileSystemBytecodeCache(),
+    # 模板只引用预先处理好的扁平变量，缺少变量说明上下文有误，直接报错而不是渲染为空
+    undefined=StrictUndefined,
+    # 模板内容固定，不需要每次get_template时检查源码是否变化
+    auto_reload=False,
+    cache_size=400
+)
+
+# 模板在导入时只加载一次，每次生成报告直接渲染
+_MARKDOWN_TEMPLATE = _ENV.get_template('report.md')
+_HTML_TEMPLATE = _ENV.get_template('report.html')
+
+
+# Markdown转换器只创建一次（扩展加载和正则编译只做一次），每次转换前reset
+_MARKDOWN = markdown.Markdown(extensions=['tables', 'fenced_code'])
+_MARKDOWN_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=128)
+def _split_key_path(keys):
+    """把'a.b.c'形式的键路径拆分为元组（结果缓存，避免重复split）"""
+    return tuple(keys.split('.'))
+
+
+def _md_to_html(markdown_text):
+    """将Markdown转换为HTML"""
+    # Markdown实例不是线程安全的，转换时加锁
+    with _MARKDOWN_LOCK:
+        return _MARKDOWN.reset().convert(markdown_text)
+
+
+class ReportGenerator:
+    def __init__(self, analysis_results):
+        self.results = analysis_results
+        self.report_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    def _get_nested_value(self, data, keys, default=None):
+        """安全获取嵌套字典的值（keys为'a.b.c'形式的字符串或键的元组）"""
+        if isinstance(keys, str):
+            keys = _split_key_path(keys)
+        
+        current = data
+        try:
+            for key in keys:
+                current = current[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return current
+    
+    @staticmethod
+    def _format_metrics_table(results, metric_columns):
+        """把各模型的指标字典整理为表格行（整列格式化为三位小数，缺失或非数值记为0）"""
+        if not results:
+            return []
+        
+        metrics_df = pd.DataFrame.from_dict(results, orient='index')
+        table = pd.DataFrame(index=metrics_df.index)
+        table['name'] = metrics_df.index.str.replace('_', ' ').str.title()
+        for column, candidates in metric_columns.items():
+            # 按候选指标名的优先级取第一个可用的值
+            values = metrics_df.reindex(columns=candidates).apply(pd.to_numeric, errors='coerce')
+            table[column] = values.bfill(axis=1).iloc[:, 0].fillna(0).map('{:.3f}'.format)
+        return table.to_dict('records')
+    
+    @staticmethod
+    def _format_importances(features, top_n=10):
+        """取前top_n个特征，重要性整列格式化为四位小数的字符串"""
+        items = list(features.items())[:top_n]
+        if not items:
+            return {}
+        
+        importances = pd.Series(
+            [value.get('importance', value) if isinstance(value, dict) else value for _, value in items],
+            index=[feature for feature, _ in items],
+            dtype=np.float64
+        )
+        return importances.map('{:.4f}'.format).to_dict()
+    
+    def generate_markdown(self):
+        """生成Markdown格式报告"""
+        # 1. 基本数据信息
+        data_info = self.results.get('data_info', {})
+        benign_count = data_info.get('benign_count', 0)
+        malignant_count = data_info.get('malignant_count', 0)
+        benign_percentage = data_info.get('benign_percentage', 0)
+        malignant_percentage = data_info.get('malignant_percentage', 0)
+        # 模板中的默认值在这里预先处理好，模板直接引用扁平的变量
+        data_shape = data_info.get('shape', 'N/A')
+        feature_count = data_info.get('feature_count', 'N/A')
+        sample_count = data_info.get('sample_count', 'N/A')
+        sample_count_text = data_info.get('sample_count', '未知数量')
         
-        final_html = Template(html_template).render(
+        # 2. 数据清洗信息
+        cleaning = self.results.get('cleaning', {})
+        missing_values = cleaning.get('missing_values', {})
+        missing_counts = missing_values.get('counts', {}) if isinstance(missing_values, dict) else {}
+        missing_percentages = missing_values.get('percentages', {}) if isinstance(missing_values, dict) else {}
+        outliers = cleaning.get('outliers', {})
+        
+        # 3. EDA信息 - 直接使用原始数据，不进行复杂的提取
+        eda_data = self.results.get('eda', {})
+        
+        # 尝试不同的访问路径获取EDA数据
+        basic_stats = None
+        correlation_results = []
+        
+        # 尝试获取基本统计信息
+        if 'basic_statistics' in eda_data:
+            basic_stats = eda_data['basic_statistics']
+        elif 'basic_stats' in eda_data:
+            basic_stats = eda_data['basic_stats']
+        basic_shape = basic_stats.get('shape') if basic_stats else None
+        target_distribution = basic_stats.get('target_distribution') if basic_stats else None
+        
+        # 尝试获取相关性分析结果
+        if 'correlation' in eda_data:
+            corr_data = eda_data['correlation']
+            if isinstance(corr_data, dict) and 'top_features_with_target' in corr_data:
+                correlation_results = corr_data['top_features_with_target']
+            elif isinstance(corr_data, list):
+                correlation_results = corr_data
+        
+        # 4. 特征重要性
+        feature_importance = self.results.get('feature_importance', {})
+        tree_model = self.results.get('tree_model', 'random_forest')
+        rf_features = self._format_importances(feature_importance.get(tree_model, {}))
+        tree_model_name = TREE_MODEL_NAMES.get(tree_model, '随机森林')
+        
+        # 5. 模型结果
+        modeling_results = self.results.get('modeling', {})
+        model_metrics = {
+            model_name: metrics for model_name, metrics in modeling_results.items()
+            if model_name != 'cross_validation' and isinstance(metrics, dict)
+        }
+        model_table_data = self._format_metrics_table(model_metrics, MODEL_TABLE_METRICS)
+        
+        # 6. 交叉验证数据
+        cv_results = {
+            model_name: cv_metrics for model_name, cv_metrics in modeling_results.get('cross_validation', {}).items()
+            if isinstance(cv_metrics, dict)
+        }
+        cv_data = self._format_metrics_table(cv_results, CV_TABLE_METRICS)
+        
+        # 7. 洞见和建议
+        insights = self.results.get('insights', [])
+        recommendations = self.results.get('recommendations', [])
+        
+        markdown_report = _MARKDOWN_TEMPLATE.render(
+            report_date=self.report_date,
+            data_shape=data_shape,
+            feature_count=feature_count,
+            sample_count=sample_count,
+            sample_count_text=sample_count_text,
+            benign_count=benign_count,
+            malignant_count=malignant_count,
+            benign_percentage=benign_percentage,
+            malignant_percentage=malignant_percentage,
+            missing_counts=missing_counts,
+            missing_percentages=missing_percentages,
+            outliers=outliers,
+            basic_stats=basic_stats,
+            basic_shape=basic_shape,
+            target_distribution=target_distribution,
+            correlation_results=correlation_results,
+            rf_features=rf_features,
+            tree_model_name=tree_model_name,
+            model_table_data=model_table_data,
+            cv_data=cv_data,
+            insights=insights,
+            recommendations=recommendations
+        )
+        
+        return markdown_report
+    
+    def generate_html(self, markdown_report):
+        """将Markdown转换为HTML"""
+        # 转换Markdown为HTML
+        html_content = _md_to_html(markdown_report)
+        
+        # 创建完整的HTML页面
+        final_html = _HTML_TEMPLATE.render(
             html_content=html_content,
             report_date=self.report_date
         )
@@ -1,52 +1,79 @@
-import matplotlib.pyplot as plt
+import matplotlib
+# 只生成图片文件，显式使用非交互式的Agg后端，跳过GUI后端探测
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
 import seaborn as sns
 import numpy as np
+import pandas as pd
 from io import BytesIO
 import base64
 
 class Visualizer:
-    def __init__(self):
+    def __init__(self, dpi=120):
+        # 按用途复用的Figure对象
         self.figures = {}
-        self.base64_images = {}
+        # 保存原始PNG字节，需要嵌入HTML时再按需进行base64编码
+        self.raw_images = {}
+        self.dpi = dpi
+    
+    @property
+    def base64_images(self):
+        """所有图像的base64编码（每次访问时生成）"""
+        return {key: self.base64_for_html(key) for key in self.raw_images}
+    
+    def base64_for_html(self, key):
+        """获取单个图像的base64编码（仅在嵌入HTML时需要）"""
+        return base64.b64encode(self.raw_images[key]).decode('ascii')
     
     def create_correlation_heatmap(self, df, figsize=(12, 10)):
         """创建相关性热力图"""
-        fig, ax = plt.subplots(figsize=figsize)
-        correlation_matrix = df.select_dtypes(include=[np.number]).corr()
+        fig, ax = self._get_figure('correlation', figsize)
+        numeric_df = df.select_dtypes(include=[np.number])
+        values = numeric_df.to_numpy(dtype=np.float32, na_value=np.nan)
+        if np.isnan(values).any():
+            # 有缺失值时需要成对删除，交给pandas计算
+            correlation_matrix = numeric_df.corr()
+        else:
+            # 无缺失值时直接在float32连续数组上计算，只在绘图时包装回DataFrame以保留标签
+            with np.errstate(invalid='ignore', divide='ignore'):
+                corr = np.corrcoef(values, rowvar=False, dtype=np.float32)
+            correlation_matrix = pd.DataFrame(corr, index=numeric_df.columns, columns=numeric_df.columns)
         sns.heatmap(correlation_matrix, annot=False, cmap='coolwarm', center=0, 
-                   square=True, linewidths=.5, cbar_kws={"shrink": .8}, ax=ax)
+                   square=True, linewidths=.5, cbar_kws={"shrink": .8}, ax=ax, rasterized=True)
         ax.set_title('Feature Correlation Heatmap')
         
-        self._save_figure_as_base64(fig, 'correlation_heatmap')
+        self._save_figure_as_png(fig, 'correlation_heatmap')
         return self
     
     def create_feature_distribution(self, df, feature, target_col='target', figsize=(10, 6)):
         """创建特征分布图"""
-        fig, axes = plt.subplots(1, 2, figsize=figsize)
+        fig, axes = self._get_figure('distribution', figsize, ncols=2)
         
-        df[feature].hist(ax=axes[0], bins=30, edgecolor='black')
+        # 直接在Axes上绘制（Series.hist会通过pyplot创建一个不受管理的默认Figure）
+        axes[0].hist(df[feature].dropna(), bins=30, edgecolor='black')
+        axes[0].grid(True)
         axes[0].set_title(f'Distribution of {feature}')
         axes[0].set_xlabel(feature)
         axes[0].set_ylabel('Frequency')
         
-        for target_value in df[target_col].unique():
-            subset = df[df[target_col] == target_value]
-            axes[1].hist(subset[feature], alpha=0.5, label=f'Target={target_value}', bins=30)
+        # 一次groupby按目标值拆分，避免每个类别都对整表做一次布尔筛选
+        for target_value, values in df.groupby(target_col, sort=False)[feature]:
+            axes[1].hist(values.to_numpy(), alpha=0.5, label=f'Target={target_value}', bins=30)
         
         axes[1].set_title(f'{feature} Distribution by Target')
         axes[1].set_xlabel(feature)
         axes[1].set_ylabel('Frequency')
         axes[1].legend()
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         key = f'distribution_{feature}'
-        self._save_figure_as_base64(fig, key)
+        self._save_figure_as_png(fig, key)
         return self
     
     def create_model_comparison(self, model_results, figsize=(12, 6)):
         """创建模型比较图"""
-        fig, ax = plt.subplots(figsize=figsize)
+        fig, ax = self._get_figure('model_comparison', figsize)
         
         models = list(model_results.keys())
         metrics = ['accuracy', 'precision', 'recall', 'f1_score']
@@ -66,16 +93,25 @@ class Visualizer:
         ax.legend()
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
-        self._save_figure_as_base64(fig, 'model_comparison')
+        self._save_figure_as_png(fig, 'model_comparison')
         return self
     
-    def _save_figure_as_base64(self, fig, key):
-        """将图形保存为base64编码"""
+    def _get_figure(self, slot, figsize, ncols=1):
+        """获取指定用途的Figure（已存在时清空后复用），并按需要的尺寸重新创建子图"""
+        fig = self.figures.get(slot)
+        if fig is None:
+            # 直接创建Figure而不经过pyplot，不进入pyplot的全局图形管理，也无需close
+            fig = Figure(figsize=figsize)
+            self.figures[slot] = fig
+        else:
+            fig.clf()
+            fig.set_size_inches(figsize)
+        return fig, fig.subplots(1, ncols)
+    
+    def _save_figure_as_png(self, fig, key, dpi=None):
+        """将图形保存为PNG字节（dpi默认使用self.dpi，HTML报告中无需300dpi）"""
         buffer = BytesIO()
-        fig.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        self.base64_images[key] = image_base64
-        plt.close(fig)
\ No newline at end of file
+        fig.savefig(buffer, format='png', dpi=dpi or self.dpi, bbox_inches='tight')
+        self.raw_images[key] = buffer.getvalue()
\ No newline at end of file
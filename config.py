@@ -18,6 +18,8 @@ ANALYSIS_CONFIG = {
     'feature_scaling_method': 'standard',  # 'standard'或'minmax'
     'feature_selection_k': 10,
     'top_features_count': 15,
+    'tree_importance_model': 'random_forest',  # 特征重要性使用的树模型：'random_forest'或'lightgbm'（需安装lightgbm）
+    'fp32_eda': False,  # EDA中相关性和正态性检验是否使用float32数组（大数据时更快，精度略低）
 }
 
 # 可视化配置
@@ -25,5 +27,5 @@ VIZ_CONFIG = {
     'figsize_corr': (14, 12),
     'figsize_dist': (12, 8),
     'figsize_model': (14, 7),
-    'dpi': 300,
+    'dpi': 120,  # 报告图片分辨率
 }
\ No newline at end of file
@@ -2,8 +2,17 @@ import pandas as pd
 import numpy as np
 import os
 import json
+import math
 from datetime import datetime
-import base64
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple
+try:
+    # 可选依赖：原生支持NumPy数组的快速JSON序列化
+    import orjson
+except ImportError:
+    orjson = None
 from config import DATA_CONFIG, ANALYSIS_CONFIG, VIZ_CONFIG
 
 # 导入自定义模块
@@ -16,22 +25,36 @@ from agents.visualizer import Visualizer
 from agents.report_generator import ReportGenerator
 
 
+class AnalysisConfig(NamedTuple):
+    """分析配置（字段与ANALYSIS_CONFIG的键一致）"""
+    test_size: float
+    random_state: int
+    cv_folds: int
+    feature_scaling_method: str
+    feature_selection_k: int
+    top_features_count: int
+    tree_importance_model: str = 'random_forest'
+    fp32_eda: bool = False
+
+
+@lru_cache(maxsize=1)
+def _analysis_config():
+    """从ANALYSIS_CONFIG构建配置（每个进程只构建一次，Web应用中各请求共用）"""
+    return AnalysisConfig(**ANALYSIS_CONFIG)
+
+
 class BreastCancerKaggleAnalyzer:
     def __init__(self, data_path=None):
         self.data_path = data_path
         self.df = None
         self.results = {}
-        self.visualizer = Visualizer()
+        self.eda = None  # EDAnalyzer，与self.df共享同一个DataFrame
+        self.visualizer = Visualizer(dpi=VIZ_CONFIG['dpi'])
         self._load_config()
     
     def _load_config(self):
         """加载配置"""
-        self.test_size = ANALYSIS_CONFIG['test_size']
-        self.random_state = ANALYSIS_CONFIG['random_state']
-        self.cv_folds = ANALYSIS_CONFIG['cv_folds']
-        self.feature_scaling_method = ANALYSIS_CONFIG['feature_scaling_method']
-        self.feature_selection_k = ANALYSIS_CONFIG['feature_selection_k']
-        self.top_features_count = ANALYSIS_CONFIG['top_features_count']
+        self.config = _analysis_config()
         
         # 诊断列映射
         self.diagnosis_mapping = DATA_CONFIG['diagnosis_mapping']
@@ -75,25 +98,44 @@ class BreastCancerKaggleAnalyzer:
         
         # 3. EDA分析
         print("\n3. 探索性数据分析...")
+        heatmap_future = None
         try:
-            eda = EDAnalyzer(self.df, target_col=self.target_column)
+            eda = self.eda = EDAnalyzer(self.df, target_col=self.target_column, fp32=self.config.fp32_eda)
             eda.basic_statistics()
             
+            def run_collecting(method, messages):
+                """在工作线程中执行分析方法，进度信息先收集起来"""
+                with eda.collect_messages(messages):
+                    return method()
+            
+            # 相关性分析、分布分析和相关性热力图都只读取当前数据、互不依赖，在线程池中同时执行
+            # （NumPy/SciPy计算和Agg渲染的大部分时间会释放GIL）；热力图的结果在可视化步骤中取用
+            correlation_messages, distribution_messages = [], []
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                correlation_future = executor.submit(run_collecting, eda.correlation_analysis, correlation_messages)
+                distribution_future = executor.submit(run_collecting, eda.distribution_analysis, distribution_messages)
+                heatmap_future = executor.submit(
+                    self.visualizer.create_correlation_heatmap,
+                    self.df,
+                    figsize=VIZ_CONFIG['figsize_corr']
+                )
+            
+            # 线程池结束后按顺序输出两个分析的进度信息，避免多线程输出交错
+            for message in correlation_messages + distribution_messages:
+                print(message)
+            
             # 添加对相关性分析的异常处理
             try:
-                eda.correlation_analysis()
+                correlation_future.result()
             except Exception as e:
                 print(f"相关性分析出错，但继续执行: {str(e)}")
                 # 确保eda_results中有correlation键
                 if 'correlation' not in eda.eda_results:
-                    eda.eda_results['correlation'] = {
-                        'matrix': {},
-                        'top_features_with_target': []
-                    }
+                    eda.eda_results['correlation'] = eda._empty_correlation()
             
             # 添加对分布分析的异常处理
             try:
-                eda.distribution_analysis()
+                distribution_future.result()
             except Exception as e:
                 print(f"分布分析出错，但继续执行: {str(e)}")
                 if 'distributions' not in eda.eda_results:
@@ -129,35 +171,42 @@ class BreastCancerKaggleAnalyzer:
         print("\n4. 特征工程...")
         try:
             feature_engineer = FeatureEngineer(self.df, target_col=self.target_column)
-            feature_engineer.scale_features(method=self.feature_scaling_method)
-            feature_engineer.feature_selection_anova(k=self.feature_selection_k)
-            feature_engineer.feature_selection_rf()
+            feature_engineer.scale_features(method=self.config.feature_scaling_method)
+            feature_engineer.feature_selection_anova(k=self.config.feature_selection_k)
+            feature_engineer.feature_selection_rf(model=self.config.tree_importance_model)
             
             self.results['feature_importance'] = feature_engineer.feature_importance
+            self.results['tree_model'] = feature_engineer.tree_model
             self.df = feature_engineer.df  # 更新处理后的数据
             
             print("特征工程完成")
-            top_features = list(feature_engineer.feature_importance['random_forest'].keys())[:5]
+            top_features = list(self._tree_importances().keys())[:5]
             print(f"最重要的5个特征: {', '.join(top_features)}")
             
         except Exception as e:
             print(f"特征工程失败: {str(e)}")
             self.results['feature_importance'] = {'error': str(e)}
         
+        if self.eda is not None:
+            # 特征缩放原地改写了与EDA共享的DataFrame（失败时也可能已改写一部分），EDA的缓存已失效
+            self.eda.invalidate()
+        
         # 5. 可视化
         print("\n5. 生成可视化...")
         try:
-            # 相关性热力图
-            self.visualizer.create_correlation_heatmap(
-                self.df, 
-                figsize=VIZ_CONFIG['figsize_corr']
-            )
+            # 相关性热力图（已在EDA步骤中并行生成；EDA未能启动时在这里生成）
+            if heatmap_future is not None:
+                heatmap_future.result()
+            else:
+                self.visualizer.create_correlation_heatmap(
+                    self.df, 
+                    figsize=VIZ_CONFIG['figsize_corr']
+                )
             
             # 重要特征分布图
-            if 'random_forest' in self.results.get('feature_importance', {}):
-                important_features = list(
-                    self.results['feature_importance']['random_forest'].keys()
-                )[:3]
+            tree_importances = self._tree_importances()
+            if tree_importances:
+                important_features = list(tree_importances.keys())[:3]
                 
                 for feature in important_features:
                     if feature in self.df.columns:
@@ -168,7 +217,7 @@ class BreastCancerKaggleAnalyzer:
                             figsize=VIZ_CONFIG['figsize_dist']
                         )
             
-            print(f"生成 {len(self.visualizer.base64_images)} 个可视化图表")
+            print(f"生成 {len(self.visualizer.raw_images)} 个可视化图表")
             
         except Exception as e:
             print(f"可视化生成失败: {str(e)}")
@@ -179,11 +228,11 @@ class BreastCancerKaggleAnalyzer:
             model_builder = ModelBuilder(
                 self.df, 
                 target_col=self.target_column,
-                test_size=self.test_size,
-                random_state=self.random_state
+                test_size=self.config.test_size,
+                random_state=self.config.random_state
             )
             
-            model_builder.prepare_data().train_models().evaluate_models().cross_validation(cv=self.cv_folds)
+            model_builder.prepare_data().train_models().evaluate_models().cross_validation(cv=self.config.cv_folds)
             self.results['modeling'] = model_builder.results
             
             # 找出最佳模型
@@ -239,8 +288,9 @@ class BreastCancerKaggleAnalyzer:
                 )
             
             # 特征重要性洞见
-            if 'feature_importance' in self.results and 'random_forest' in self.results['feature_importance']:
-                top_features = list(self.results['feature_importance']['random_forest'].keys())[:3]
+            tree_importances = self._tree_importances()
+            if tree_importances:
+                top_features = list(tree_importances.keys())[:3]
                 insights.append(f"最重要的预测特征: {', '.join(top_features)}")
             
             # 相关性洞见
@@ -315,28 +365,44 @@ class BreastCancerKaggleAnalyzer:
                 f.write(html_report)
             
             # 保存可视化图像
-            for key, fig_base64 in self.visualizer.base64_images.items():
+            # 直接写入PNG字节，无需base64编解码
+            for key, png in self.visualizer.raw_images.items():
                 img_filename = f'reports/{key}_{timestamp}.png'
                 with open(img_filename, 'wb') as f:
-                    f.write(base64.b64decode(fig_base64))
+                    f.write(png)
+            
+            # 相关性矩阵单独保存为.npy文件，JSON中只记录文件路径
+            json_results, matrix_filename = self._split_correlation_matrix(timestamp)
             
             # 保存原始结果数据（JSON格式）
             json_filename = f'reports/analysis_results_{timestamp}.json'
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                # 将numpy类型转换为Python原生类型以便JSON序列化
-                json_results = self._convert_to_json_serializable(self.results)
-                json.dump(json_results, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                # orjson直接序列化numpy数组和标量，无需先转换为Python对象
+                with open(json_filename, 'wb') as f:
+                    f.write(orjson.dumps(
+                        json_results,
+                        default=self._json_default,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                    ))
+            else:
+                with open(json_filename, 'w', encoding='utf-8') as f:
+                    # 标准库json会把NaN/inf写成非法的NaN/Infinity，且不会对float调用回调，
+                    # 因此先把非有限浮点数替换为None，输出与orjson一致
+                    json.dump(self._replace_non_finite(json_results), f, indent=2, ensure_ascii=False,
+                              allow_nan=False, default=self._json_default)
             
             print(f"报告已保存到 reports/ 目录")
             print(f"- Markdown报告: {md_filename}")
             print(f"- HTML报告: {html_filename}")
-            print(f"- 可视化图表: {len(self.visualizer.base64_images)} 个PNG文件")
+            print(f"- 可视化图表: {len(self.visualizer.raw_images)} 个PNG文件")
             print(f"- 结果数据: {json_filename}")
+            if matrix_filename:
+                print(f"- 相关性矩阵: {matrix_filename}")
             
             return {
                 'markdown': markdown_report,
                 'html': html_report,
-                'visualizations': list(self.visualizer.base64_images.keys()),
+                'visualizations': list(self.visualizer.raw_images.keys()),
                 'timestamp': timestamp,
                 'files': {
                     'markdown': md_filename,
@@ -349,24 +415,61 @@ class BreastCancerKaggleAnalyzer:
             print(f"生成报告失败: {str(e)}")
             raise
     
-    def _convert_to_json_serializable(self, obj):
-        """将对象转换为JSON可序列化的格式"""
-        if isinstance(obj, (np.integer, np.int64, np.int32, np.int16, np.int8)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32, np.float16)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
+    def _tree_importances(self):
+        """树模型的特征重要性（保存在实际使用的模型名下），没有结果时为空字典"""
+        feature_importance = self.results.get('feature_importance', {})
+        return feature_importance.get(self.results.get('tree_model'), {})
+    
+    def _split_correlation_matrix(self, timestamp):
+        """
+        把相关性矩阵从结果中拆出单独保存为.npy文件
+        
+        Returns:
+            (用于导出JSON的结果字典, 矩阵文件路径)；没有相关性矩阵时路径为None
+        """
+        eda = self.results.get('eda', {})
+        correlation = eda.get('correlation', {})
+        matrix_values = correlation.get('matrix_values')
+        if matrix_values is None or matrix_values.size == 0:
+            return self.results, None
+        
+        matrix_filename = f'reports/correlation_matrix_{timestamp}.npy'
+        np.save(matrix_filename, matrix_values)
+        
+        # 浅拷贝替换，不修改self.results
+        correlation = {k: v for k, v in correlation.items() if k != 'matrix_values'}
+        correlation['matrix_file'] = matrix_filename
+        json_results = {**self.results, 'eda': {**eda, 'correlation': correlation}}
+        return json_results, matrix_filename
+    
+    @staticmethod
+    def _json_default(obj):
+        """JSON序列化的回调：只处理序列化库不能直接处理的对象"""
+        if isinstance(obj, np.ndarray):
             return obj.tolist()
-        elif isinstance(obj, dict):
-            return {k: self._convert_to_json_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._convert_to_json_serializable(item) for item in obj]
-        elif isinstance(obj, tuple):
-            return tuple(self._convert_to_json_serializable(item) for item in obj)
-        elif pd.isna(obj):
+        if isinstance(obj, Mapping):
+            # 如EDA中按需计算的LazyDict，导出时才计算全部的值
+            return dict(obj)
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, pd.Timestamp):
+            return obj.isoformat()
+        if obj is pd.NA or obj is pd.NaT:
             return None
-        else:
-            return obj
+        raise TypeError(f"无法序列化为JSON的类型: {type(obj).__name__}")
+    
+    @classmethod
+    def _replace_non_finite(cls, obj):
+        """标准库json的预处理：把NaN/inf（包括数组和numpy标量中的）替换为None"""
+        if isinstance(obj, (float, np.floating)):
+            return float(obj) if math.isfinite(obj) else None
+        if isinstance(obj, np.ndarray):
+            obj = obj.tolist()
+        if isinstance(obj, Mapping):
+            return {k: cls._replace_non_finite(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [cls._replace_non_finite(item) for item in obj]
+        return obj
 
 
 def main():
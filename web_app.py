@@ -7,23 +7,81 @@ warnings.filterwarnings('ignore')
 
 from flask import Flask, request, jsonify, render_template, send_file
 import os
-import uuid
 import sys
+import json
+import hashlib
+import tempfile
 
 # 添加当前目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from main import BreastCancerKaggleAnalyzer
+from config import DATA_CONFIG, ANALYSIS_CONFIG, VIZ_CONFIG
 
 app = Flask(__name__)
-UPLOAD_FOLDER = 'uploads'
 REPORT_FOLDER = 'reports'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+CACHE_FOLDER = 'cache'  # 按数据内容哈希缓存的分析结果
+DEFAULT_DATA_PATH = 'data/breast_cancer_kaggle.csv'
 os.makedirs(REPORT_FOLDER, exist_ok=True)
+os.makedirs(CACHE_FOLDER, exist_ok=True)
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB限制
 
+def _sha256_of_file(path):
+    """计算文件内容的SHA-256"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+# 默认数据集的哈希只在启动时计算一次
+DEFAULT_DATA_HASH = _sha256_of_file(DEFAULT_DATA_PATH) if os.path.exists(DEFAULT_DATA_PATH) else None
+
+# 配置的指纹：修改分析配置后不再命中旧的缓存结果
+CONFIG_HASH = hashlib.sha256(
+    json.dumps([DATA_CONFIG, ANALYSIS_CONFIG, VIZ_CONFIG], sort_keys=True).encode('utf-8')
+).hexdigest()[:16]
+
+def _cache_path(data_hash):
+    """缓存文件路径，由数据哈希和配置指纹共同决定"""
+    return os.path.join(CACHE_FOLDER, f'{data_hash}-{CONFIG_HASH}.json')
+
+def _load_cached_result(data_hash):
+    """读取相同数据的历史分析结果（缓存损坏或报告文件已被删除时视为未命中）"""
+    try:
+        with open(_cache_path(data_hash), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not all(os.path.exists(path) for path in cached.get('files', {}).values()):
+        return None
+    return cached
+
+def _save_cached_result(data_hash, result):
+    """先写临时文件再原子替换，并发请求不会读到写了一半的缓存"""
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_FOLDER, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, _cache_path(data_hash))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _analyze_with_cache(data_hash, data_source):
+    """运行完整分析并返回报告文件和时间戳；相同数据和配置已分析过时直接返回缓存"""
+    result = _load_cached_result(data_hash)
+    if result is None:
+        report = BreastCancerKaggleAnalyzer(data_source).run_full_analysis()
+        result = {
+            'files': report['files'],
+            'report_files': report['visualizations'],
+            'timestamp': report['timestamp']
+        }
+        _save_cached_result(data_hash, result)
+    return result
+
 @app.route('/')
 def index():
     """首页"""
@@ -36,21 +94,22 @@ def analyze_data():
         # 检查是否有文件上传
         if 'file' not in request.files:
             # 如果没有文件，使用默认数据
-            default_path = 'data/breast_cancer_kaggle.csv'
+            default_path = DEFAULT_DATA_PATH
             if not os.path.exists(default_path):
                 return jsonify({
                     'success': False,
                     'error': '没有上传文件且默认数据文件不存在'
                 })
             
-            analyzer = BreastCancerKaggleAnalyzer(default_path)
-            report = analyzer.run_full_analysis()
+            # 默认数据已分析过时直接返回已有报告
+            data_hash = DEFAULT_DATA_HASH or _sha256_of_file(default_path)
+            result = _analyze_with_cache(data_hash, default_path)
             
             return jsonify({
                 'success': True,
                 'message': '使用默认数据集分析完成',
-                'report_files': report['visualizations'],
-                'timestamp': report['timestamp']
+                'report_files': result['report_files'],
+                'timestamp': result['timestamp']
             })
         
         file = request.files['file']
@@ -59,29 +118,22 @@ def analyze_data():
             return jsonify({'success': False, 'error': '没有选择文件'}), 400
         
         if file and file.filename.endswith('.csv'):
-            # 保存上传的文件
-            file_id = str(uuid.uuid4())[:8]
-            filename = f"{file_id}_{file.filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            # 相同内容的文件已分析过时直接返回已有报告
+            data_hash = hashlib.sha256(file.stream.read()).hexdigest()
+            file.stream.seek(0)
             
             try:
-                # 运行分析
-                analyzer = BreastCancerKaggleAnalyzer(filepath)
-                report = analyzer.run_full_analysis()
+                # 直接从上传文件的流中读取数据，不写入磁盘
+                result = _analyze_with_cache(data_hash, file.stream)
                 
                 return jsonify({
                     'success': True,
                     'message': '文件分析完成',
-                    'report_files': report['visualizations'],
-                    'timestamp': report['timestamp']
+                    'report_files': result['report_files'],
+                    'timestamp': result['timestamp']
                 })
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)}), 500
-            finally:
-                # 清理上传的文件
-                if os.path.exists(filepath):
-                    os.remove(filepath)
         else:
             return jsonify({'success': False, 'error': '请上传CSV文件'}), 400
             
@@ -123,15 +175,11 @@ def api_analyze():
         # 获取数据（可以是文件或JSON数据）
         if 'file' in request.files:
             file = request.files['file']
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"temp_{uuid.uuid4()}.csv")
-            file.save(filepath)
             
-            analyzer = BreastCancerKaggleAnalyzer(filepath)
+            # 直接从上传文件的流中读取数据，不写入磁盘
+            analyzer = BreastCancerKaggleAnalyzer(file.stream)
             report = analyzer.run_full_analysis()
             
-            # 清理临时文件
-            os.remove(filepath)
-            
             return jsonify({
                 'success': True,
                 'data': report
@@ -150,4 +198,6 @@ if __name__ == '__main__':
     print("访问 http://localhost:5000 使用Web界面")
     print("按 Ctrl+C 停止服务器")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # threaded=True是Flask 1.0起的默认值，这里显式写出；关闭debug以停用调试器和重载器（重载器会把应用加载两次）
+    # 生产环境可使用: gunicorn -w 4 -k gthread --threads 4 -b 0.0.0.0:5000 web_app:app
+    app.run(host='0.0.0.0', port=5000, threaded=True, debug=False)
\ No newline at end of file